@@ -0,0 +1,322 @@
+# backend/archive.py
+"""
+Cold archive for prices/news older than the hot window.
+
+Compaction moves old rows out of SQLite into one file per (series, year):
+
+  <archive>/prices/<series>/<year>.bin
+    header (16 bytes) | t_ms int64[n] | price float64[n]
+
+  <archive>/news/<series>/<year>.bin
+    header (16 bytes) | t_ms int64[n] | offsets uint64[5n + 1] | utf-8 blob
+    (field j of row i is blob[offsets[5i + j]:offsets[5i + j + 1]], with
+    fields id, category, source, title, url)
+
+Columns are fixed-width in native byte order, so readers mmap the file and
+binary-search the t_ms column in place without parsing anything.
+
+SQLite keeps a per-series `archived_before` mark in `meta`: rows older than
+it are served from here, newer rows from the live tables.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.db import (
+    REPO_ROOT,
+    LeaseHeld,
+    bump_data_version,
+    connect,
+    ingest_lease,
+    init_db,
+    renew_lease,
+    set_archived_before,
+)
+
+DEFAULT_ARCHIVE_DIR = os.path.join(REPO_ROOT, "backend", "archive")
+# Longer than the widest API range (1Y) so normal requests stay on the hot tables.
+DEFAULT_HOT_DAYS = 400
+
+DAY_MS = 24 * 3600 * 1000
+
+_HEADER = struct.Struct("<4s4xQ")  # magic, pad, row count
+_PRICES_MAGIC = b"GSP1"
+_NEWS_MAGIC = b"GSN2"
+_NEWS_FIELDS = 5  # id, category, source, title, url
+
+NewsRow = Tuple[str, int, str, str, str, str]  # id, t_ms, category, source, title, url
+
+
+def get_archive_dir() -> str:
+    return os.getenv("GAS_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+
+
+def get_hot_days() -> int:
+    return int(os.getenv("GAS_HOT_DAYS", str(DEFAULT_HOT_DAYS)))
+
+
+def _year(t_ms: int) -> int:
+    return datetime.fromtimestamp(t_ms / 1000, tz=timezone.utc).year
+
+
+def _path(kind: str, series: str, year: int) -> str:
+    return os.path.join(get_archive_dir(), kind, series, f"{year}.bin")
+
+
+# -------------------------
+# Reading (mmap)
+# -------------------------
+# Files are only ever replaced via os.replace, so (path, mtime, size) identifies
+# a file version; a stale map just keeps pointing at the old inode until dropped.
+_maps: Dict[str, Tuple[Tuple[int, int], memoryview]] = {}
+
+
+def _map(path: str) -> Optional[memoryview]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _maps.pop(path, None)
+        return None
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = _maps.get(path)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+    with open(path, "rb") as f:
+        mv = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    _maps[path] = (sig, mv)
+    return mv
+
+
+def _columns(mv: memoryview, magic: bytes):
+    tag, n = _HEADER.unpack_from(mv)
+    if tag != magic:
+        raise ValueError(f"Bad archive file header {tag!r}")
+    off = _HEADER.size
+    t = mv[off:off + 8 * n].cast("q")
+    return n, t, off + 8 * n
+
+
+def _year_files(kind: str, series: str, tmin: int, tmax: int) -> Iterator[memoryview]:
+    for year in range(_year(tmin), _year(tmax) + 1):
+        mv = _map(_path(kind, series, year))
+        if mv is not None:
+            yield mv
+
+
+def read_prices(series: str, tmin: int, tmax: int) -> Iterator[Tuple[int, float]]:
+    """Yields (t_ms, price) with tmin <= t_ms <= tmax, ascending."""
+    for mv in _year_files("prices", series, tmin, tmax):
+        n, t, off = _columns(mv, _PRICES_MAGIC)
+        p = mv[off:off + 8 * n].cast("d")
+        for i in range(bisect_left(t, tmin), bisect_right(t, tmax)):
+            yield t[i], p[i]
+
+
+def read_news(series: str, tmin: int, tmax: int) -> Iterator[NewsRow]:
+    """Yields (id, t_ms, category, source, title, url) with tmin <= t_ms <= tmax, ascending."""
+    for mv in _year_files("news", series, tmin, tmax):
+        n, t, off = _columns(mv, _NEWS_MAGIC)
+        n_off = _NEWS_FIELDS * n + 1
+        offsets = mv[off:off + 8 * n_off].cast("Q")
+        blob = off + 8 * n_off
+        for i in range(bisect_left(t, tmin), bisect_right(t, tmax)):
+            k = _NEWS_FIELDS * i
+            id_, category, source, title, url = (
+                str(mv[blob + offsets[j]:blob + offsets[j + 1]], "utf-8")
+                for j in range(k, k + _NEWS_FIELDS)
+            )
+            yield id_, t[i], category, source, title, url
+
+
+def last_time(kind: str, series: str) -> Optional[int]:
+    """Latest archived t_ms for a series, or None if nothing is archived."""
+    d = os.path.join(get_archive_dir(), kind, series)
+    try:
+        years = sorted(int(f[:-4]) for f in os.listdir(d) if f.endswith(".bin"))
+    except FileNotFoundError:
+        return None
+    magic = _PRICES_MAGIC if kind == "prices" else _NEWS_MAGIC
+    for year in reversed(years):
+        mv = _map(_path(kind, series, year))
+        if mv is None:
+            continue
+        n, t, _ = _columns(mv, magic)
+        if n:
+            return t[n - 1]
+    return None
+
+
+# -------------------------
+# Writing
+# -------------------------
+def _write_atomic(path: str, parts: List[bytes]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        for part in parts:
+            f.write(part)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _merge_prices(series: str, year: int, rows: List[Tuple[int, float]]) -> None:
+    path = _path("prices", series, year)
+    merged: Dict[int, float] = {}
+    mv = _map(path)
+    if mv is not None:
+        n, t, off = _columns(mv, _PRICES_MAGIC)
+        p = mv[off:off + 8 * n].cast("d")
+        merged.update(zip(t, p))
+    merged.update(rows)  # newer values win
+
+    ts = sorted(merged)
+    _write_atomic(path, [
+        _HEADER.pack(_PRICES_MAGIC, len(ts)),
+        array("q", ts).tobytes(),
+        array("d", (merged[x] for x in ts)).tobytes(),
+    ])
+
+
+def _merge_news(series: str, year: int, rows: List[NewsRow]) -> None:
+    path = _path("news", series, year)
+    merged: Dict[str, NewsRow] = {}
+    if os.path.exists(path):
+        merged.update((r[0], r) for r in read_news(series, *_year_bounds(year)))
+    merged.update((r[0], r) for r in rows)
+
+    ordered = sorted(merged.values(), key=lambda r: (r[1], r[0]))
+    offsets = array("Q", [0])
+    chunks: List[bytes] = []
+    for id_, _, category, source, title, url in ordered:
+        for field in (id_, category, source, title, url):
+            b = field.encode("utf-8")
+            chunks.append(b)
+            offsets.append(offsets[-1] + len(b))
+
+    _write_atomic(path, [
+        _HEADER.pack(_NEWS_MAGIC, len(ordered)),
+        array("q", (r[1] for r in ordered)).tobytes(),
+        offsets.tobytes(),
+        b"".join(chunks),
+    ])
+
+
+def _year_bounds(year: int) -> Tuple[int, int]:
+    lo = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    hi = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp() * 1000) - 1
+    return lo, hi
+
+
+def _by_year(rows, t_index: int) -> Dict[int, list]:
+    out: Dict[int, list] = {}
+    for r in rows:
+        out.setdefault(_year(r[t_index]), []).append(r)
+    return out
+
+
+# -------------------------
+# Compaction job
+# -------------------------
+def compact(hot_days: Optional[int] = None) -> Dict[str, int]:
+    """
+    Moves prices/news older than `hot_days` into the archive, then reclaims
+    space in the live database.
+
+    Archive files are written before the rows are deleted, so a crash in
+    between only leaves duplicates that the next run merges away. Callers
+    must hold the ingest lease (see backend.db.ingest_lease).
+    """
+    hot_days = get_hot_days() if hot_days is None else hot_days
+    cutoff = int(time.time() * 1000) - hot_days * DAY_MS
+    moved = {"prices_archived": 0, "news_archived": 0}
+
+    with connect() as conn:
+        # Opens the write transaction, so the rows read below can't change
+        # before they're deleted.
+        renew_lease(conn)
+        for (series,) in conn.execute(
+            "SELECT DISTINCT series FROM prices WHERE t_ms < ?;", (cutoff,)
+        ).fetchall():
+            rows = [
+                (int(t), float(p))
+                for t, p in conn.execute(
+                    "SELECT t_ms, price FROM prices WHERE series = ? AND t_ms < ? ORDER BY t_ms;",
+                    (series, cutoff),
+                )
+            ]
+            for year, chunk in _by_year(rows, 0).items():
+                _merge_prices(series, year, chunk)
+            conn.execute("DELETE FROM prices WHERE series = ? AND t_ms < ?;", (series, cutoff))
+            set_archived_before(conn, "prices", series, cutoff)
+            moved["prices_archived"] += len(rows)
+
+        for (series,) in conn.execute(
+            "SELECT DISTINCT series FROM news WHERE t_ms < ?;", (cutoff,)
+        ).fetchall():
+            rows = [
+                (r["id"], int(r["t_ms"]), r["category"], r["source"], r["title"], r["url"])
+                for r in conn.execute(
+                    """
+                    SELECT id, t_ms, category, source, title, url
+                    FROM news WHERE series = ? AND t_ms < ? ORDER BY t_ms;
+                    """,
+                    (series, cutoff),
+                )
+            ]
+            for year, chunk in _by_year(rows, 1).items():
+                _merge_news(series, year, chunk)
+            conn.execute("DELETE FROM news WHERE series = ? AND t_ms < ?;", (series, cutoff))
+            set_archived_before(conn, "news", series, cutoff)
+            moved["news_archived"] += len(rows)
+
+        if moved["prices_archived"] or moved["news_archived"]:
+            bump_data_version(conn)
+
+    moved["pages_freed"] = reclaim_space()
+    return moved
+
+
+def reclaim_space() -> int:
+    """Incremental vacuum + WAL checkpoint. Returns the number of pages freed."""
+    with connect() as conn:
+        if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+            # Databases created before auto_vacuum was enabled need one full
+            # VACUUM to switch modes; after that it's incremental only.
+            # VACUUM can't run inside a transaction, so renew and commit first;
+            # it holds SQLite's exclusive lock, so nobody else writes meanwhile.
+            renew_lease(conn)
+            conn.commit()
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+            conn.execute("VACUUM;")
+        renew_lease(conn)
+        conn.commit()
+        before = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+        conn.execute("PRAGMA incremental_vacuum;").fetchall()
+        after = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchall()
+    return int(before - after)
+
+
+def main():
+    init_db()
+    try:
+        with ingest_lease():
+            res = compact()
+    except LeaseHeld:
+        raise SystemExit("Ingest/compaction already running in another process.")
+    print(
+        f"Archived {res['prices_archived']} price rows and {res['news_archived']} news rows; "
+        f"freed {res['pages_freed']} pages."
+    )
+
+
+if __name__ == "__main__":
+    main()
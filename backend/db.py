@@ -2,13 +2,25 @@
 from __future__ import annotations
 
 import os
+import socket
 import sqlite3
+import threading
+import time
+import uuid
 from contextlib import contextmanager
 from typing import Iterator, Optional
 
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DEFAULT_DB_PATH = os.path.join(REPO_ROOT, "backend", "gas_dashboard.sqlite3")
 
+# With several uvicorn workers, writers queue on the WAL lock instead of
+# failing fast with "database is locked".
+BUSY_TIMEOUT_S = 30.0
+
+# Only one process may ingest or compact at a time; see acquire_lease.
+INGEST_LEASE = "ingest"
+INGEST_LEASE_TTL_S = float(os.getenv("GAS_INGEST_LEASE_S", "600"))
+
 
 def get_db_path() -> str:
     return os.getenv("GAS_DB_PATH", DEFAULT_DB_PATH)
@@ -17,7 +29,7 @@ def get_db_path() -> str:
 @contextmanager
 def connect(db_path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
     path = db_path or get_db_path()
-    conn = sqlite3.connect(path)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S)
     try:
         conn.row_factory = sqlite3.Row
         # A little nicer for concurrent reads/writes
@@ -29,8 +41,60 @@ def connect(db_path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
         conn.close()
 
 
+class LeaseHeld(RuntimeError):
+    """Another process currently holds the lease."""
+
+
+# Owner token of the ingest lease held by the current thread (see ingest_lease).
+_held = threading.local()
+
+
+@contextmanager
+def ingest_lease() -> Iterator[str]:
+    """
+    Holds INGEST_LEASE for the duration of the block, raising LeaseHeld if
+    another process (ingest, compaction, API worker or CLI) already has it.
+    Writers inside the block call renew_lease() before each write.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+    if not acquire_lease(INGEST_LEASE, owner, INGEST_LEASE_TTL_S):
+        raise LeaseHeld(f"Lease {INGEST_LEASE!r} is held by another process.")
+    _held.owner = owner
+    try:
+        yield owner
+    finally:
+        _held.owner = None
+        release_lease(INGEST_LEASE, owner)
+
+
+def renew_lease(conn: sqlite3.Connection) -> None:
+    """
+    Extends this thread's ingest lease as the first statement of `conn`'s write
+    transaction, or raises LeaseHeld if it expired and another process took it.
+
+    The UPDATE takes SQLite's write lock, so nobody can steal the lease between
+    this check and the commit: a slow fetch or VACUUM that outlives the TTL
+    aborts instead of writing alongside the new holder.
+    """
+    owner = getattr(_held, "owner", None)
+    if owner is None:
+        raise LeaseHeld(f"Lease {INGEST_LEASE!r} is not held by this thread.")
+    cur = conn.execute(
+        "UPDATE leases SET expires_at_ms = ? WHERE name = ? AND owner = ?;",
+        (int(time.time() * 1000) + int(INGEST_LEASE_TTL_S * 1000), INGEST_LEASE, owner),
+    )
+    if cur.rowcount != 1:
+        raise LeaseHeld(f"Lease {INGEST_LEASE!r} expired and was taken by another process.")
+
+
 def init_db() -> None:
     with connect() as conn:
+        if conn.execute("SELECT COUNT(*) FROM sqlite_master;").fetchone()[0] == 0:
+            # Fresh file: enable incremental auto-vacuum so compaction can hand
+            # freed pages back. connect() already wrote the WAL header, so the
+            # mode only sticks after a VACUUM (instant on an empty file).
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+            conn.execute("VACUUM;")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS prices (
@@ -61,3 +125,81 @@ def init_db() -> None:
         )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_news_series_t ON news(series, t_ms);")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_news_category ON news(category);")
+
+        # Cross-process coordination (multi-worker deployments)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+              name  TEXT PRIMARY KEY,
+              owner TEXT NOT NULL,
+              expires_at_ms INTEGER NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+              key   TEXT PRIMARY KEY,
+              value INTEGER NOT NULL
+            );
+            """
+        )
+
+
+def acquire_lease(name: str, owner: str, ttl_s: float) -> bool:
+    """
+    Takes the named lease for `owner` if it is free, expired, or already ours.
+    A single UPSERT makes this atomic across processes; the expiry means a
+    worker that dies mid-ingest can't hold the lease forever.
+    """
+    now_ms = int(time.time() * 1000)
+    with connect() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO leases(name, owner, expires_at_ms) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE
+              SET owner = excluded.owner, expires_at_ms = excluded.expires_at_ms
+              WHERE leases.expires_at_ms < ? OR leases.owner = excluded.owner;
+            """,
+            (name, owner, now_ms + int(ttl_s * 1000), now_ms),
+        )
+        return cur.rowcount == 1
+
+
+def release_lease(name: str, owner: str) -> None:
+    with connect() as conn:
+        conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?;", (name, owner))
+
+
+def get_data_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'data_version';").fetchone()
+    return int(row[0]) if row else 0
+
+
+def bump_data_version(conn: sqlite3.Connection) -> None:
+    """Call inside the same transaction as the write so readers never see new rows with an old version."""
+    conn.execute(
+        """
+        INSERT INTO meta(key, value) VALUES ('data_version', 1)
+        ON CONFLICT(key) DO UPDATE SET value = value + 1;
+        """
+    )
+
+
+def get_archived_before(conn: sqlite3.Connection, table: str, series: str) -> int:
+    """Rows of `table`/`series` older than this live in the cold archive (see backend.archive)."""
+    row = conn.execute(
+        "SELECT value FROM meta WHERE key = ?;", (f"archived_before:{table}:{series}",)
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def set_archived_before(conn: sqlite3.Connection, table: str, series: str, t_ms: int) -> None:
+    # Never moves backwards: anything below the old mark is already archived.
+    conn.execute(
+        """
+        INSERT INTO meta(key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value);
+        """,
+        (f"archived_before:{table}:{series}", int(t_ms)),
+    )
@@ -9,7 +9,15 @@ import requests
 from datetime import datetime
 from typing import List, Tuple
 
-from backend.db import connect, init_db
+from backend.db import (
+    LeaseHeld,
+    bump_data_version,
+    connect,
+    get_archived_before,
+    ingest_lease,
+    init_db,
+    renew_lease,
+)
 load_dotenv()
 
 
@@ -67,6 +75,10 @@ def upsert_prices(series: str, points: List[Tuple[int, float]], source: str) ->
     rows = [(series, t, p, source, now_ms) for (t, p) in points]
 
     with connect() as conn:
+        renew_lease(conn)
+        # EIA returns the full history every time; skip what's already archived
+        cutoff = get_archived_before(conn, "prices", series)
+        rows = [r for r in rows if r[1] >= cutoff]
         cur = conn.executemany(
             """
             INSERT OR REPLACE INTO prices(series, t_ms, price, source, inserted_at_ms)
@@ -74,6 +86,7 @@ def upsert_prices(series: str, points: List[Tuple[int, float]], source: str) ->
             """,
             rows,
         )
+        bump_data_version(conn)
         return cur.rowcount if cur.rowcount is not None else len(rows)
 
 
@@ -84,13 +97,17 @@ def main():
     if not api_key:
         raise SystemExit("Missing EIA_API_KEY env var.")
 
-    series_id = os.getenv("EIA_HH_SERIES_ID", DEFAULT_SERIES_ID).strip()
-    points = fetch_series(api_key, series_id)
-
-    # Your app’s “series” label used everywhere else
-    series_label = "HENRY_HUB_SPOT"
-    n = upsert_prices(series_label, points, source=f"EIA:{series_id}")
-    print(f"Upserted {n} price rows for {series_label} from {series_id}.")
+    try:
+        with ingest_lease():
+            series_id = os.getenv("EIA_HH_SERIES_ID", DEFAULT_SERIES_ID).strip()
+            points = fetch_series(api_key, series_id)
+
+            # Your app’s “series” label used everywhere else
+            series_label = "HENRY_HUB_SPOT"
+            n = upsert_prices(series_label, points, source=f"EIA:{series_id}")
+            print(f"Upserted {n} price rows for {series_label} from {series_id}.")
+    except LeaseHeld:
+        raise SystemExit("Ingest/compaction already running in another process.")
 
 
 if __name__ == "__main__":
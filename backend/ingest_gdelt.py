@@ -8,7 +8,15 @@ import requests
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
 
-from backend.db import connect, init_db
+from backend.db import (
+    LeaseHeld,
+    bump_data_version,
+    connect,
+    get_archived_before,
+    ingest_lease,
+    init_db,
+    renew_lease,
+)
 
 GDELT_DOC = "https://api.gdeltproject.org/api/v2/doc/doc"
 
@@ -146,6 +154,10 @@ def upsert_news(series: str, items: List[Dict[str, Any]]) -> int:
         for it in items
     ]
     with connect() as conn:
+        renew_lease(conn)
+        # Archived history is immutable; don't re-grow the hot table with it
+        cutoff = get_archived_before(conn, "news", series)
+        rows = [r for r in rows if r[2] >= cutoff]
         cur = conn.executemany(
             """
             INSERT OR REPLACE INTO news(id, series, t_ms, category, source, title, url, inserted_at_ms)
@@ -153,18 +165,23 @@ def upsert_news(series: str, items: List[Dict[str, Any]]) -> int:
             """,
             rows,
         )
+        bump_data_version(conn)
         return cur.rowcount if cur.rowcount is not None else len(rows)
 
 
 def main():
     init_db()
 
-    # Attach news to the “series” label your UI queries
-    series = "NG_FUTURES"
+    try:
+        with ingest_lease():
+            # Attach news to the “series” label your UI queries
+            series = "NG_FUTURES"
 
-    items = fetch_news(hours_back=24, maxrecords=25)
-    n = upsert_news(series, items)
-    print(f"Upserted {n} news items for {series}.")
+            items = fetch_news(hours_back=24, maxrecords=25)
+            n = upsert_news(series, items)
+            print(f"Upserted {n} news items for {series}.")
+    except LeaseHeld:
+        raise SystemExit("Ingest/compaction already running in another process.")
 
 
 if __name__ == "__main__":
@@ -8,7 +8,15 @@ from urllib.parse import urlparse
 
 import feedparser
 
-from backend.db import connect, init_db
+from backend.db import (
+    LeaseHeld,
+    bump_data_version,
+    connect,
+    get_archived_before,
+    ingest_lease,
+    init_db,
+    renew_lease,
+)
 from backend.feeds import FEEDS
 
 # Reuse your simple classifier if it exists, else fallback to "OTHER"
@@ -76,6 +84,10 @@ def upsert_news(series: str, items: List[Dict[str, Any]]) -> int:
         for it in items
     ]
     with connect() as conn:
+        renew_lease(conn)
+        # Archived history is immutable; don't re-grow the hot table with it
+        cutoff = get_archived_before(conn, "news", series)
+        rows = [r for r in rows if r[2] >= cutoff]
         cur = conn.executemany(
             """
             INSERT OR REPLACE INTO news(id, series, t_ms, category, source, title, url, inserted_at_ms)
@@ -83,6 +95,7 @@ def upsert_news(series: str, items: List[Dict[str, Any]]) -> int:
             """,
             rows,
         )
+        bump_data_version(conn)
         return cur.rowcount if cur.rowcount is not None else len(rows)
 
 
@@ -91,17 +104,21 @@ def main():
     if not FEEDS:
         raise SystemExit("No FEEDS configured in backend/feeds.py")
 
-    series = "HENRY_HUB_SPOT"  # keep consistent with your frontend param
-    total = 0
-
-    for feed_url in FEEDS:
-        items = fetch_feed(feed_url, limit=75)
-        n = upsert_news(series, items)
-        print(f"Ingested {n} items from {feed_url}")
-        total += n
-        time.sleep(0.5)  # be polite
-
-    print(f"Done. Upserted total {total} items into SQLite.")
+    try:
+        with ingest_lease():
+            series = "HENRY_HUB_SPOT"  # keep consistent with your frontend param
+            total = 0
+
+            for feed_url in FEEDS:
+                items = fetch_feed(feed_url, limit=75)
+                n = upsert_news(series, items)
+                print(f"Ingested {n} items from {feed_url}")
+                total += n
+                time.sleep(0.5)  # be polite
+
+            print(f"Done. Upserted total {total} items into SQLite.")
+    except LeaseHeld:
+        raise SystemExit("Ingest/compaction already running in another process.")
 
 
 if __name__ == "__main__":
@@ -4,12 +4,21 @@ from __future__ import annotations
 import os
 import time
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from fastapi import FastAPI, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from backend.db import connect, init_db
+from backend import archive
+from backend.db import (
+    LeaseHeld,
+    connect,
+    get_archived_before,
+    get_data_version,
+    ingest_lease,
+    init_db,
+)
 
 app = FastAPI(title="Gas Market Dashboard API", version="0.4.0")
 
@@ -31,6 +40,26 @@ def _range_to_days(r: str) -> int:
     return {"1D": 1, "5D": 5, "1M": 30, "3M": 90, "6M": 180, "1Y": 365}.get(r, 30)
 
 
+# Per-worker response cache, keyed by (endpoint, series, days) and tagged with
+# the shared data_version. Ingest bumps the version, so a single PK lookup
+# tells every worker whether its cached payload is still current.
+_cache: Dict[Tuple[Any, ...], Tuple[int, Any]] = {}
+
+
+def _cached(conn, key: Tuple[Any, ...], build: Callable[[], Any]) -> Any:
+    # One read transaction for the whole request: the version tag, the
+    # archived_before split, MAX(t_ms) and the row SELECTs all see one snapshot,
+    # so a compaction committing mid-request can't drop rows between them.
+    conn.execute("BEGIN;")
+    version = get_data_version(conn)
+    hit = _cache.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    value = build()
+    _cache[key] = (version, value)
+    return value
+
+
 @app.post("/api/reingest")
 def api_reingest():
     """
@@ -38,80 +67,184 @@ def api_reingest():
       - EIA prices ingest (Henry Hub spot)
       - RSS news ingest
     Returns how many rows were upserted.
+
+    Guarded by a cross-process lease: if another worker is already
+    ingesting or compacting, this returns 409 instead of contending for the
+    write lock.
     """
     init_db()
     t0 = time.time()
     try:
-        # ---- PRICES (EIA) ----
-        from backend.ingest_eia import fetch_series, upsert_prices, DEFAULT_SERIES_ID
-
-        api_key = os.getenv("EIA_API_KEY", "").strip()
-        if not api_key:
-            raise HTTPException(status_code=500, detail="Missing EIA_API_KEY env var.")
-
-        eia_series_id = os.getenv("EIA_HH_SERIES_ID", DEFAULT_SERIES_ID).strip()
-        price_points = fetch_series(api_key, eia_series_id)
-
-        prices_series = "HENRY_HUB_SPOT"
-        prices_count = upsert_prices(prices_series, price_points, source=f"EIA:{eia_series_id}")
-
-        # ---- NEWS (RSS) ----
-        from backend.ingest_rss import fetch_feed, upsert_news
-        from backend.feeds import FEEDS
-
-        news_series = "HENRY_HUB_SPOT"
-        news_count = 0
-        if FEEDS:
-            for feed_url in FEEDS:
-                items = fetch_feed(feed_url, limit=75)
-                news_count += upsert_news(news_series, items)
-                time.sleep(0.25)  # light politeness
-
-        return {
-            "ok": True,
-            "prices_ingested": int(prices_count),
-            "news_ingested": int(news_count),
-            "elapsed_s": round(time.time() - t0, 2),
-        }
-
+        with ingest_lease():
+            # ---- PRICES (EIA) ----
+            from backend.ingest_eia import fetch_series, upsert_prices, DEFAULT_SERIES_ID
+
+            api_key = os.getenv("EIA_API_KEY", "").strip()
+            if not api_key:
+                raise HTTPException(status_code=500, detail="Missing EIA_API_KEY env var.")
+
+            eia_series_id = os.getenv("EIA_HH_SERIES_ID", DEFAULT_SERIES_ID).strip()
+            price_points = fetch_series(api_key, eia_series_id)
+
+            prices_series = "HENRY_HUB_SPOT"
+            prices_count = upsert_prices(prices_series, price_points, source=f"EIA:{eia_series_id}")
+
+            # ---- NEWS (RSS) ----
+            from backend.ingest_rss import fetch_feed, upsert_news
+            from backend.feeds import FEEDS
+
+            news_series = "HENRY_HUB_SPOT"
+            news_count = 0
+            if FEEDS:
+                for feed_url in FEEDS:
+                    items = fetch_feed(feed_url, limit=75)
+                    news_count += upsert_news(news_series, items)
+                    time.sleep(0.25)  # light politeness
+
+            return {
+                "ok": True,
+                "prices_ingested": int(prices_count),
+                "news_ingested": int(news_count),
+                "elapsed_s": round(time.time() - t0, 2),
+            }
+
+    except LeaseHeld:
+        raise HTTPException(status_code=409, detail="Ingest or compaction already running.")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/prices")
-def api_prices(
-    range: str = Query("1M", pattern="^(1D|5D|1M|3M|6M|1Y)$"),
-    series: str = Query("HENRY_HUB_SPOT", pattern="^(NG_FUTURES|HENRY_HUB_SPOT)$"),
-):
+@app.post("/api/compact")
+def api_compact():
+    """
+    Moves prices/news older than GAS_HOT_DAYS into the cold archive, then runs
+    incremental vacuum + WAL checkpoint. Shares the ingest lease, so it never
+    overlaps an ingest in any worker.
+    """
+    init_db()
+    t0 = time.time()
+    try:
+        with ingest_lease():
+            res = archive.compact()
+        return {"ok": True, **res, "elapsed_s": round(time.time() - t0, 2)}
+    except LeaseHeld:
+        raise HTTPException(status_code=409, detail="Ingest or compaction already running.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _normalize_series(series: str) -> str:
     # Temporary convenience: treat NG_FUTURES as Henry Hub until you add real futures
-    if series == "NG_FUTURES":
-        series = "HENRY_HUB_SPOT"
+    return "HENRY_HUB_SPOT" if series == "NG_FUTURES" else series
 
-    days = _range_to_days(range)
 
-    with connect() as conn:
-        row = conn.execute(
-            "SELECT MAX(t_ms) AS tmax FROM prices WHERE series = ?;",
-            (series,),
-        ).fetchone()
-        if not row or row["tmax"] is None:
-            return []
-        tmax = int(row["tmax"])
-        tmin = tmax - days * 24 * 3600 * 1000
-
-        rows = conn.execute(
+def _window(conn, table: str, series: str, days: int):
+    """
+    Returns (tmin, tmax, split) for the latest `days` of `table`, or None if
+    empty. Rows with t_ms < split live in the cold archive, the rest in SQLite.
+    """
+    split = get_archived_before(conn, table, series)
+    row = conn.execute(
+        f"SELECT MAX(t_ms) AS tmax FROM {table} WHERE series = ?;",
+        (series,),
+    ).fetchone()
+    tmax = row["tmax"] if row else None
+    if tmax is None and split:
+        # Everything for this series has aged out of the hot tables
+        tmax = archive.last_time(table, series)
+    if tmax is None:
+        return None
+    tmax = int(tmax)
+    return tmax - days * 24 * 3600 * 1000, tmax, split
+
+
+def _query_prices(conn, series: str, days: int) -> list:
+    win = _window(conn, "prices", series, days)
+    if win is None:
+        return []
+    tmin, tmax, split = win
+
+    out = []
+    if tmin < split:
+        out.extend({"t": t, "p": p} for t, p in archive.read_prices(series, tmin, min(tmax, split - 1)))
+    cur = conn.execute(
+        """
+        SELECT t_ms, price
+        FROM prices
+        WHERE series = ? AND t_ms BETWEEN ? AND ?
+        ORDER BY t_ms ASC;
+        """,
+        (series, max(tmin, split), tmax),
+    )
+    out.extend({"t": int(t), "p": float(p)} for t, p in cur)
+    return out
+
+
+def _ui_category(category: Optional[str]) -> str:
+    # Same mapping as normalizeCategory in frontend/app.js, so counts match the filters
+    if not category:
+        return "OTHER"
+    if category == "POLICY":
+        return "SUPPLY"
+    return category
+
+
+def _query_news(conn, series: str, days: int, counts: Optional[dict] = None) -> list:
+    """
+    If `counts` is given, per-category counts (keyed by the UI category, see
+    _ui_category) are tallied into it while the rows are streamed, so callers
+    don't need a second pass or query.
+    """
+    win = _window(conn, "news", series, days)
+    if win is None:
+        return []
+    tmin, tmax, split = win
+
+    rows = []
+    if tmin < split:
+        rows.append(archive.read_news(series, tmin, min(tmax, split - 1)))
+    rows.append(
+        conn.execute(
             """
-            SELECT t_ms, price
-            FROM prices
+            SELECT id, t_ms, category, source, title, url
+            FROM news
             WHERE series = ? AND t_ms BETWEEN ? AND ?
             ORDER BY t_ms ASC;
             """,
-            (series, tmin, tmax),
-        ).fetchall()
+            (series, max(tmin, split), tmax),
+        )
+    )
+
+    out = []
+    for src in rows:
+        for id_, t, category, source, title, url in src:
+            out.append(
+                {
+                    "id": id_,
+                    "t": int(t),
+                    "category": category,
+                    "source": source,
+                    "title": title,
+                    "url": url,
+                }
+            )
+            if counts is not None:
+                cat = _ui_category(category)
+                counts[cat] = counts.get(cat, 0) + 1
+    return out
 
-    return [{"t": int(r["t_ms"]), "p": float(r["price"])} for r in rows]
+
+@app.get("/api/prices")
+def api_prices(
+    range: str = Query("1M", pattern="^(1D|5D|1M|3M|6M|1Y)$"),
+    series: str = Query("HENRY_HUB_SPOT", pattern="^(NG_FUTURES|HENRY_HUB_SPOT)$"),
+):
+    series = _normalize_series(series)
+    days = _range_to_days(range)
+    with connect() as conn:
+        return _cached(conn, ("prices", series, days), lambda: _query_prices(conn, series, days))
 
 
 @app.get("/api/news")
@@ -121,42 +254,36 @@ def api_news(
 ):
     # If you later ingest separate futures news, this will matter.
     # For now, keep both options valid.
-    if series == "NG_FUTURES":
-        series = "HENRY_HUB_SPOT"
+    series = _normalize_series(series)
+    days = _range_to_days(range)
+    with connect() as conn:
+        return _cached(conn, ("news", series, days), lambda: _query_news(conn, series, days))
+
 
+@app.get("/api/dashboard")
+def api_dashboard(
+    range: str = Query("1M", pattern="^(1D|5D|1M|3M|6M|1Y)$"),
+    series: str = Query("HENRY_HUB_SPOT", pattern="^(NG_FUTURES|HENRY_HUB_SPOT)$"),
+):
+    """
+    Prices + news + per-category news counts in one response, so the
+    frontend's first paint needs a single round trip.
+
+    Everything is read on one connection inside one transaction (see _cached),
+    so prices and news come from the same snapshot even if an ingest commits
+    mid-request.
+    """
+    series = _normalize_series(series)
     days = _range_to_days(range)
 
+    def build():
+        counts: dict = {}
+        prices = _query_prices(conn, series, days)
+        news = _query_news(conn, series, days, counts)
+        return {"prices": prices, "news": news, "counts": counts}
+
     with connect() as conn:
-        row = conn.execute(
-            "SELECT MAX(t_ms) AS tmax FROM news WHERE series = ?;",
-            (series,),
-        ).fetchone()
-        if not row or row["tmax"] is None:
-            return []
-        tmax = int(row["tmax"])
-        tmin = tmax - days * 24 * 3600 * 1000
-
-        rows = conn.execute(
-            """
-            SELECT id, t_ms, category, source, title, url
-            FROM news
-            WHERE series = ? AND t_ms BETWEEN ? AND ?
-            ORDER BY t_ms ASC;
-            """,
-            (series, tmin, tmax),
-        ).fetchall()
-
-    return [
-        {
-            "id": r["id"],
-            "t": int(r["t_ms"]),
-            "category": r["category"],
-            "source": r["source"],
-            "title": r["title"],
-            "url": r["url"],
-        }
-        for r in rows
-    ]
+        return _cached(conn, ("dashboard", series, days), build)
 
 
 # -------------------------
@@ -186,13 +186,24 @@
     highlightSelectedInList();
   }
 
+  // Appends the server's per-category headline counts to each filter label.
+  function renderCategoryCounts(counts) {
+    for (const c of $$(".filter__check")) {
+      const label = c.parentElement && c.parentElement.querySelector(".filter__label");
+      if (!label) continue;
+      if (!label.dataset.name) label.dataset.name = label.textContent;
+      const n = counts[(c.dataset.cat || "").trim()] || 0;
+      label.textContent = `${label.dataset.name} (${n})`;
+    }
+  }
+
   async function refreshAll() {
     const r = state.range;
 
     setStatus("Loading…");
     try {
-      const prices = await apiGetJson(`/api/prices?range=${encodeURIComponent(r)}&series=HENRY_HUB_SPOT`);
-      const news = await apiGetJson(`/api/news?range=${encodeURIComponent(r)}&series=HENRY_HUB_SPOT`);
+      // One round trip: prices + news come from the same DB snapshot
+      const { prices, news, counts } = await apiGetJson(`/api/dashboard?range=${encodeURIComponent(r)}&series=HENRY_HUB_SPOT`);
 
       // Normalize categories for UI consistency
       const newsNorm = (news || []).map((ev) => ({ ...ev, category: normalizeCategory(ev.category) }));
@@ -200,6 +211,8 @@
       state.prices = prices || [];
       state.news = newsNorm || [];
 
+      renderCategoryCounts(counts || {});
+
       // Apply filters to markers right away (so chart matches list)
       const filteredEvents = getFilteredEventsForUI();
 
@@ -230,18 +243,27 @@
   }
 
   // 🔥 Auto reingest on every page load
+  // First paint uses whatever is already in the DB; the fresh ingest runs
+  // alongside it and triggers a second refresh when it lands.
   async function autoReingestThenLoad() {
     setStatus("Initializing (fresh ingest)…");
-    try {
-      const res = await apiPostJson("/api/reingest", {});
-      const p = res?.prices_ingested ?? "?";
-      const n = res?.news_ingested ?? "?";
-      setStatus(`Initialized (prices: ${p}, news: ${n}). Loading…`);
-    } catch (e) {
-      console.error("Auto reingest failed:", e);
-      // If ingest fails, still attempt to load whatever is there (or show error)
-      setStatus(`Init ingest failed: ${e.message || e}. Loading…`);
+    // Settle the ingest promise up front so a fast failure isn't reported as unhandled
+    const ingest = apiPostJson("/api/reingest", {}).then(
+      (res) => ({ res }),
+      (err) => ({ err })
+    );
+    await refreshAll();
+
+    const { res, err } = await ingest;
+    if (err) {
+      console.error("Auto reingest failed:", err);
+      // If ingest fails, keep showing whatever was already there
+      setStatus(`Init ingest failed: ${err.message || err}`);
+      return;
     }
+    const p = res?.prices_ingested ?? "?";
+    const n = res?.news_ingested ?? "?";
+    setStatus(`Initialized (prices: ${p}, news: ${n}). Loading…`);
     await refreshAll();
   }
 
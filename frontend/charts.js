@@ -1,5 +1,11 @@
 // frontend/charts.js
-// Minimal SVG time-series chart with event markers + tooltip (no external libs)
+// Minimal canvas time-series chart with event markers + tooltip (no external libs)
+//
+// Three stacked canvases, each redrawn only when its inputs change:
+//   line    - grid, axes, price area + line (data or size changes)
+//   markers - event markers (events, marker toggle or size changes)
+//   overlay - focus line + selected marker (selection / focus changes)
+// All redraws are coalesced into one requestAnimationFrame.
 
 (function () {
   function getCssVar(name) {
@@ -23,6 +29,16 @@
 
   const MONTHS = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"];
 
+  const PAD = { l: 46, r: 18, t: 16, b: 34 };
+  const AXIS_COLOR = "rgba(230,237,246,0.55)";
+  const AXIS_FONT = "700 11px ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial";
+  const UNIT_FONT = "11px ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial";
+
+  const MARKER_R = 6;
+  const MARKER_R_SELECTED = 7;
+  const HIT_R = 8;
+  const CELL = 16; // spatial index cell size (px)
+
   function clamp(x, a, b) {
     return Math.max(a, Math.min(b, x));
   }
@@ -35,10 +51,33 @@
     return `${d.getFullYear()}-${pad2(d.getMonth() + 1)}-${pad2(d.getDate())} ${pad2(d.getHours())}:${pad2(d.getMinutes())}`;
   }
 
-  function createEl(tag, attrs = {}) {
-    const el = document.createElementNS("http://www.w3.org/2000/svg", tag);
-    for (const [k, v] of Object.entries(attrs)) el.setAttribute(k, String(v));
-    return el;
+  // Accepts either [{t, p}, ...] or columnar { t: ArrayLike, p: ArrayLike }.
+  function toColumns(prices) {
+    if (!prices) return { t: new Float64Array(0), p: new Float64Array(0) };
+    if (!Array.isArray(prices) && prices.t && prices.p) {
+      return {
+        t: prices.t instanceof Float64Array ? prices.t : Float64Array.from(prices.t),
+        p: prices.p instanceof Float64Array ? prices.p : Float64Array.from(prices.p),
+      };
+    }
+    const n = prices.length;
+    const t = new Float64Array(n);
+    const p = new Float64Array(n);
+    for (let i = 0; i < n; i++) {
+      t[i] = prices[i].t;
+      p[i] = prices[i].p;
+    }
+    return { t, p };
+  }
+
+  function minMax(arr) {
+    let lo = Infinity, hi = -Infinity;
+    for (let i = 0; i < arr.length; i++) {
+      const v = arr[i];
+      if (v < lo) lo = v;
+      if (v > hi) hi = v;
+    }
+    return [lo, hi];
   }
 
   class GasChart {
@@ -46,6 +85,12 @@
       this.container = document.getElementById(containerId);
       if (!this.container) throw new Error(`Chart container #${containerId} not found`);
 
+      this.layers = {
+        line: this._createLayer("line"),
+        markers: this._createLayer("markers"),
+        overlay: this._createLayer("overlay"),
+      };
+
       this.tooltip = document.createElement("div");
       this.tooltip.className = "tooltip";
       this.container.appendChild(this.tooltip);
@@ -59,30 +104,65 @@
       this._focusTs = null;
       this._selectedEventId = null;
 
-      window.addEventListener("resize", () => this.render());
+      this._cols = toColumns(null);
+      this._markers = null;     // per-event typed arrays (see _buildMarkers)
+      this._index = null;       // spatial grid over marker pixel positions
+      this._scale = null;
+      this._size = { w: 0, h: 0, dpr: 1 };
+
+      this._needsLayout = true;
+      this._needsMarkerGeom = true;
+      this._dirty = { line: true, markers: true, overlay: true };
+      this._raf = 0;
+
+      const ov = this.layers.overlay.canvas;
+      ov.addEventListener("mousemove", (e) => this._onMouseMove(e));
+      ov.addEventListener("mouseleave", () => {
+        ov.style.cursor = "";
+        this.hideTooltip();
+      });
+      ov.addEventListener("click", (e) => this._onClick(e));
+
+      window.addEventListener("resize", () => {
+        this._needsLayout = true;
+        this._invalidate("line", "markers", "overlay");
+      });
     }
 
     setData({ prices, events }) {
-      this.state.prices = prices || [];
-      this.state.events = events || [];
-      this.render();
+      prices = prices || [];
+      events = events || [];
+
+      if (prices !== this.state.prices) {
+        this.state.prices = prices;
+        this._cols = toColumns(prices);
+        this._needsLayout = true;
+        this._invalidate("line", "markers", "overlay");
+      }
+      if (events !== this.state.events) {
+        this.state.events = events;
+        this._markers = null;
+        this._invalidate("markers", "overlay");
+      }
     }
 
     setShowMarkers(show) {
-      this.state.showMarkers = !!show;
-      this.render();
+      show = !!show;
+      if (show === this.state.showMarkers) return;
+      this.state.showMarkers = show;
+      this._invalidate("markers", "overlay");
     }
 
     focusTime(tsMs) {
       this._focusTs = tsMs;
-      this.render();
+      this._invalidate("overlay");
     }
 
     // Optional API used by app.js (if present)
     selectEvent(eventId, tsMs) {
       this._selectedEventId = eventId != null ? String(eventId) : null;
       this._focusTs = tsMs != null ? tsMs : null;
-      this.render();
+      this._invalidate("overlay");
     }
 
     _eventId(ev) {
@@ -91,201 +171,371 @@
       return `${ev.category || "OTHER"}|${ev.t || 0}|${hash(ev.title || "")}`;
     }
 
+    // Force a full redraw on the next frame.
     render() {
-      const { prices, events, showMarkers } = this.state;
+      this._needsLayout = true;
+      this._invalidate("line", "markers", "overlay");
+    }
 
-      this.container.querySelectorAll("svg").forEach((n) => n.remove());
-      this.tooltip.classList.remove("tooltip--show");
+    _createLayer(name) {
+      const canvas = document.createElement("canvas");
+      canvas.className = `chart__layer chart__layer--${name}`;
+      this.container.appendChild(canvas);
+      return { canvas, ctx: canvas.getContext("2d") };
+    }
+
+    _invalidate(...names) {
+      for (const n of names) this._dirty[n] = true;
+      if (!this._raf) this._raf = requestAnimationFrame(() => this._flush());
+    }
+
+    _flush() {
+      this._raf = 0;
+
+      if (this._needsLayout) this._layout();
+      if (!this._markers) this._buildMarkers();
+      if (this._needsMarkerGeom) this._layoutMarkers();
+
+      if (this._dirty.line) this._drawLine();
+      if (this._dirty.markers) this._drawMarkers();
+      if (this._dirty.overlay) this._drawOverlay();
+      this._dirty.line = this._dirty.markers = this._dirty.overlay = false;
+    }
+
+    // ----- LAYOUT -----
+
+    _layout() {
+      this._needsLayout = false;
+      this._needsMarkerGeom = true;
+      this._dirty.line = this._dirty.markers = this._dirty.overlay = true;
 
       const w = this.container.clientWidth;
       const h = this.container.clientHeight;
-      if (w < 200 || h < 200 || prices.length < 2) return;
+      const dpr = window.devicePixelRatio || 1;
+
+      if (w !== this._size.w || h !== this._size.h || dpr !== this._size.dpr) {
+        this._size = { w, h, dpr };
+        for (const { canvas, ctx } of Object.values(this.layers)) {
+          canvas.width = Math.max(1, Math.round(w * dpr));
+          canvas.height = Math.max(1, Math.round(h * dpr));
+          canvas.style.width = `${w}px`;
+          canvas.style.height = `${h}px`;
+          ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+        }
+      }
 
-      const padL = 46, padR = 18, padT = 16, padB = 34;
-      const innerW = w - padL - padR;
-      const innerH = h - padT - padB;
+      const { t, p } = this._cols;
+      if (w < 200 || h < 200 || t.length < 2) {
+        this._scale = null;
+        this._linePaths = null;
+        return;
+      }
 
-      const times = prices.map(p => p.t);
-      const vals = prices.map(p => p.p);
+      const innerW = w - PAD.l - PAD.r;
+      const innerH = h - PAD.t - PAD.b;
 
-      const tMin = Math.min(...times);
-      const tMax = Math.max(...times);
+      const tMin = t[0];
+      const tMax = t[t.length - 1];
 
-      const vMin0 = Math.min(...vals);
-      const vMax0 = Math.max(...vals);
+      const [vMin0, vMax0] = minMax(p);
       const vPad = (vMax0 - vMin0) * 0.08 || 0.1;
       const vMin = vMin0 - vPad;
       const vMax = vMax0 + vPad;
 
-      const x = (t) => padL + ((t - tMin) / (tMax - tMin)) * innerW;
-      const y = (v) => padT + (1 - (v - vMin) / (vMax - vMin)) * innerH;
+      this._scale = {
+        w, h, innerW, innerH, tMin, tMax, vMin, vMax,
+        x: (tt) => PAD.l + ((tt - tMin) / (tMax - tMin)) * innerW,
+        y: (v) => PAD.t + (1 - (v - vMin) / (vMax - vMin)) * innerH,
+      };
+      this._linePaths = buildLinePaths(t, p, this._scale);
+    }
+
+    _buildMarkers() {
+      const events = this.state.events;
+      const n = events.length;
+      const colorKeys = [];
+      const colorIdx = new Uint8Array(n);
+      const ids = new Array(n);
+
+      for (let i = 0; i < n; i++) {
+        const ev = events[i];
+        const color = CATEGORY_COLORS[ev.category] || CATEGORY_COLORS.OTHER;
+        let k = colorKeys.indexOf(color);
+        if (k < 0) k = colorKeys.push(color) - 1;
+        colorIdx[i] = k;
+        ids[i] = this._eventId(ev);
+      }
 
-      const svg = createEl("svg", {
-        viewBox: `0 0 ${w} ${h}`,
-        preserveAspectRatio: "none",
-      });
-      this.container.appendChild(svg);
+      this._markers = {
+        n,
+        ids,
+        colors: colorKeys,
+        colorIdx,
+        x: new Float32Array(n),
+        y: new Float32Array(n),
+      };
+      this._needsMarkerGeom = true;
+    }
 
-      const grid = createEl("g", { class: "grid" });
-      const axis = createEl("g", { class: "axis" });
+    // Project markers onto the price line and bucket them into a uniform grid
+    // so hover/click hit-testing only scans nearby markers.
+    _layoutMarkers() {
+      this._needsMarkerGeom = false;
+      const m = this._markers;
+      const s = this._scale;
+      if (!s || !m) {
+        this._index = null;
+        return;
+      }
+
+      const { t, p } = this._cols;
+      const events = this.state.events;
+      for (let i = 0; i < m.n; i++) {
+        const tt = events[i].t;
+        m.x[i] = s.x(tt);
+        m.y[i] = s.y(p[nearestIndex(t, tt)]);
+      }
+
+      const cols = Math.max(1, Math.ceil(s.w / CELL));
+      const rows = Math.max(1, Math.ceil(s.h / CELL));
+      const start = new Uint32Array(cols * rows + 1);
+      const cellOf = new Uint32Array(m.n);
+
+      for (let i = 0; i < m.n; i++) {
+        const cx = clamp(Math.floor(m.x[i] / CELL), 0, cols - 1);
+        const cy = clamp(Math.floor(m.y[i] / CELL), 0, rows - 1);
+        const c = cy * cols + cx;
+        cellOf[i] = c;
+        start[c + 1]++;
+      }
+      for (let c = 0; c < cols * rows; c++) start[c + 1] += start[c];
+
+      const fill = start.slice(0, cols * rows);
+      const items = new Uint32Array(m.n);
+      for (let i = 0; i < m.n; i++) items[fill[cellOf[i]]++] = i;
 
-      // ----- Y AXIS -----
+      this._index = { cols, rows, start, items };
+    }
+
+    _hitMarker(px, py) {
+      const idx = this._index;
+      const m = this._markers;
+      if (!idx || !m || !this.state.showMarkers) return -1;
+
+      const cx = Math.floor(px / CELL);
+      const cy = Math.floor(py / CELL);
+      let best = -1;
+      let bestD = HIT_R * HIT_R;
+
+      for (let gy = Math.max(0, cy - 1); gy <= Math.min(idx.rows - 1, cy + 1); gy++) {
+        for (let gx = Math.max(0, cx - 1); gx <= Math.min(idx.cols - 1, cx + 1); gx++) {
+          const c = gy * idx.cols + gx;
+          for (let k = idx.start[c]; k < idx.start[c + 1]; k++) {
+            const i = idx.items[k];
+            const dx = m.x[i] - px;
+            const dy = m.y[i] - py;
+            const d = dx * dx + dy * dy;
+            if (d <= bestD) {
+              bestD = d;
+              best = i;
+            }
+          }
+        }
+      }
+      return best;
+    }
+
+    _selectedIndex() {
+      const m = this._markers;
+      if (!m || this._selectedEventId == null) return -1;
+      return m.ids.indexOf(this._selectedEventId);
+    }
+
+    // ----- DRAWING -----
+
+    _clear(layer) {
+      const { ctx } = this.layers[layer];
+      ctx.clearRect(0, 0, this._size.w, this._size.h);
+      return ctx;
+    }
+
+    _drawLine() {
+      const ctx = this._clear("line");
+      const s = this._scale;
+      if (!s) return;
+
+      const { w, h, innerW, innerH, tMin, tMax, vMin, vMax } = s;
+
+      // ----- GRID + Y AXIS -----
+      ctx.strokeStyle = "rgba(255,255,255,0.06)";
+      ctx.lineWidth = 1;
+      ctx.fillStyle = AXIS_COLOR;
+      ctx.font = AXIS_FONT;
+
+      const grid = new Path2D();
       const yTicks = 5;
+      ctx.textAlign = "end";
       for (let i = 0; i <= yTicks; i++) {
         const frac = i / yTicks;
-        const yy = padT + frac * innerH;
-        grid.appendChild(createEl("line", { x1: padL, y1: yy, x2: w - padR, y2: yy }));
-
-        const vTick = (vMax - frac * (vMax - vMin)).toFixed(2);
-        const txt = createEl("text", { x: padL - 8, y: yy + 4, "text-anchor": "end" });
-        txt.textContent = vTick;
-        axis.appendChild(txt);
+        const yy = PAD.t + frac * innerH;
+        grid.moveTo(PAD.l, yy);
+        grid.lineTo(w - PAD.r, yy);
+        ctx.fillText((vMax - frac * (vMax - vMin)).toFixed(2), PAD.l - 8, yy + 4);
       }
 
       // ----- X AXIS: MONTHLY GRID + LABELS -----
+      ctx.textAlign = "start";
       let cursor = new Date(new Date(tMin).getFullYear(), new Date(tMin).getMonth(), 1);
       if (cursor.getTime() < tMin) cursor = new Date(cursor.getFullYear(), cursor.getMonth() + 1, 1);
 
       while (cursor.getTime() <= tMax) {
-        const ms = cursor.getTime();
-        const xx = x(ms);
-
-        grid.appendChild(createEl("line", {
-          x1: xx, y1: padT, x2: xx, y2: h - padB
-        }));
-
-        const txt = createEl("text", {
-          x: xx + 2,
-          y: h - 12,
-          "text-anchor": "start"
-        });
-        txt.textContent = MONTHS[cursor.getMonth()];
-        axis.appendChild(txt);
-
+        const xx = s.x(cursor.getTime());
+        grid.moveTo(xx, PAD.t);
+        grid.lineTo(xx, h - PAD.b);
+        ctx.fillText(MONTHS[cursor.getMonth()], xx + 2, h - 12);
         cursor = new Date(cursor.getFullYear(), cursor.getMonth() + 1, 1);
       }
-
-      svg.appendChild(grid);
-      svg.appendChild(axis);
+      ctx.stroke(grid);
 
       // Y-axis unit label
-      const yUnit = createEl("text", {
-        x: padL + 10,
-        y: padT + 40,
-        "text-anchor": "end",
-        "font-size": "11",
-        fill: "rgba(230,237,246,0.55)"
-      });
-      yUnit.textContent = "$/MMBtu";
-      svg.appendChild(yUnit);
+      ctx.font = UNIT_FONT;
+      ctx.textAlign = "end";
+      ctx.fillText("$/MMBtu", PAD.l + 10, PAD.t + 40);
 
       // ----- PRICE LINE + AREA -----
-      let d = "";
-      for (let i = 0; i < prices.length; i++) {
-        const px = x(prices[i].t);
-        const py = y(prices[i].p);
-        d += (i === 0 ? "M" : "L") + px + " " + py + " ";
+      const { line, area } = this._linePaths;
+      ctx.fillStyle = "rgba(91,214,255,0.14)";
+      ctx.fill(area);
+
+      ctx.strokeStyle = CATEGORY_COLORS.PRICE;
+      ctx.lineWidth = 2.2;
+      ctx.lineJoin = "round";
+      ctx.stroke(line);
+    }
+
+    _drawMarkers() {
+      const ctx = this._clear("markers");
+      const m = this._markers;
+      if (!this._scale || !m || !m.n || !this.state.showMarkers) return;
+
+      // One path per category color keeps fill/stroke calls constant in marker count.
+      ctx.lineWidth = 1;
+      ctx.strokeStyle = "rgba(255,255,255,0.25)";
+      ctx.globalAlpha = 0.95;
+      for (let k = 0; k < m.colors.length; k++) {
+        const path = new Path2D();
+        for (let i = 0; i < m.n; i++) {
+          if (m.colorIdx[i] !== k) continue;
+          path.moveTo(m.x[i] + MARKER_R, m.y[i]);
+          path.arc(m.x[i], m.y[i], MARKER_R, 0, Math.PI * 2);
+        }
+        ctx.fillStyle = m.colors[k];
+        ctx.fill(path);
+        ctx.stroke(path);
       }
+      ctx.globalAlpha = 1;
+    }
 
-      const areaD = `${d} L ${x(prices.at(-1).t)} ${padT + innerH} L ${x(prices[0].t)} ${padT + innerH} Z`;
+    _drawOverlay() {
+      const ctx = this._clear("overlay");
+      const s = this._scale;
+      if (!s) return;
 
-      svg.appendChild(createEl("path", { d: areaD, class: "price-area" }));
-      svg.appendChild(createEl("path", { d, class: "price-line" }));
+      const bottom = PAD.t + s.innerH;
 
       // ----- FOCUS LINE (optional) -----
       if (this._focusTs != null) {
-        const fx = x(clamp(this._focusTs, tMin, tMax));
-        svg.appendChild(createEl("line", {
-          x1: fx, y1: padT, x2: fx, y2: padT + innerH,
-          stroke: "rgba(255,255,255,0.25)",
-          "stroke-dasharray": "4 4"
-        }));
+        const fx = s.x(clamp(this._focusTs, s.tMin, s.tMax));
+        ctx.strokeStyle = "rgba(255,255,255,0.25)";
+        ctx.lineWidth = 1;
+        ctx.setLineDash([4, 4]);
+        ctx.beginPath();
+        ctx.moveTo(fx, PAD.t);
+        ctx.lineTo(fx, bottom);
+        ctx.stroke();
       }
 
-      // ----- EVENT MARKERS ON PRICE LINE -----
-      if (showMarkers && events?.length) {
-        const markerLayer = createEl("g", { class: "markers" });
-
-        for (const ev of events) {
-          const idx = nearestIndex(times, ev.t);
-          const p = prices[idx];
-          if (!p) continue;
-
-          const ex = x(ev.t);
-          const ey = y(p.p);
-
-          const id = this._eventId(ev);
-          const isSelected = this._selectedEventId === id;
-
-          const color = CATEGORY_COLORS[ev.category] || CATEGORY_COLORS.OTHER;
-
-          const g = createEl("g", { class: "marker" });
-
-          if (isSelected) {
-            g.appendChild(createEl("line", {
-              x1: ex, y1: ey + 7,
-              x2: ex, y2: padT + innerH,
-              stroke: "rgba(255,255,255,0.18)",
-              "stroke-dasharray": "3 4"
-            }));
-          }
+      // ----- SELECTED MARKER -----
+      const i = this.state.showMarkers ? this._selectedIndex() : -1;
+      if (i >= 0) {
+        const m = this._markers;
+        const ex = m.x[i], ey = m.y[i];
+
+        ctx.strokeStyle = "rgba(255,255,255,0.18)";
+        ctx.lineWidth = 1;
+        ctx.setLineDash([3, 4]);
+        ctx.beginPath();
+        ctx.moveTo(ex, ey + 7);
+        ctx.lineTo(ex, bottom);
+        ctx.stroke();
+
+        ctx.setLineDash([]);
+        ctx.beginPath();
+        ctx.arc(ex, ey, MARKER_R_SELECTED, 0, Math.PI * 2);
+        ctx.globalAlpha = 0.95;
+        ctx.fillStyle = m.colors[m.colorIdx[i]];
+        ctx.fill();
+        ctx.globalAlpha = 1;
+        ctx.strokeStyle = "rgba(255,255,255,0.55)";
+        ctx.lineWidth = 2;
+        ctx.stroke();
+      }
+      ctx.setLineDash([]);
+    }
 
-          const c = createEl("circle", {
-            cx: ex,
-            cy: ey,
-            r: isSelected ? 7 : 6,
-            fill: color,
-            "fill-opacity": "0.95",
-            stroke: isSelected ? "rgba(255,255,255,0.55)" : "rgba(255,255,255,0.25)",
-            "stroke-width": isSelected ? 2 : 1
-          });
-
-          g.appendChild(c);
-
-          g.addEventListener("mouseenter", () => this.showTooltip(ev, ex, ey));
-          g.addEventListener("mousemove", (e) => this.moveTooltip(e));
-          g.addEventListener("mouseleave", () => this.hideTooltip());
-
-          g.addEventListener("click", (e) => {
-            e.stopPropagation();
-            this._selectedEventId = id;
-            this._focusTs = ev.t;
-            if (window.GAS_APP && typeof window.GAS_APP.onEventClicked === "function") {
-              window.GAS_APP.onEventClicked(ev);
-            }
-            this.render();
-          });
+    // ----- INTERACTION -----
 
-          markerLayer.appendChild(g);
-        }
+    _pointer(e) {
+      const rect = this.container.getBoundingClientRect();
+      return [e.clientX - rect.left, e.clientY - rect.top];
+    }
 
-        svg.appendChild(markerLayer);
+    _onMouseMove(e) {
+      const s = this._scale;
+      if (!s) return;
+      const [mx, my] = this._pointer(e);
 
-        svg.addEventListener("click", () => {
-          this._selectedEventId = null;
-          this._focusTs = null;
-          this.render();
-        });
+      // ----- MARKER HOVER -----
+      const hit = this._hitMarker(mx, my);
+      this.layers.overlay.canvas.style.cursor = hit >= 0 ? "pointer" : "";
+      if (hit >= 0) {
+        this.showTooltip(this.state.events[hit], this._markers.x[hit], this._markers.y[hit]);
+        this.moveTooltip(e);
+        return;
       }
 
       // ----- PRICE HOVER -----
-      svg.addEventListener("mousemove", (e) => {
-        const rect = this.container.getBoundingClientRect();
-        const mx = e.clientX - rect.left;
-        const tGuess = tMin + ((mx - padL) / innerW) * (tMax - tMin);
-        const idx = nearestIndex(times, tGuess);
-        const p = prices[idx];
-        if (!p) return;
-
-        this.showTooltip(
-          { title: `Price: ${p.p.toFixed(3)}`, source: "Henry Hub", category: "PRICE", t: p.t },
-          x(p.t),
-          y(p.p)
-        );
-        this.moveTooltip(e);
-      });
+      const { t, p } = this._cols;
+      const tGuess = s.tMin + ((mx - PAD.l) / s.innerW) * (s.tMax - s.tMin);
+      const idx = nearestIndex(t, tGuess);
+
+      this.showTooltip(
+        { title: `Price: ${p[idx].toFixed(3)}`, source: "Henry Hub", category: "PRICE", t: t[idx] },
+        s.x(t[idx]),
+        s.y(p[idx])
+      );
+      this.moveTooltip(e);
+    }
 
-      svg.addEventListener("mouseleave", () => this.hideTooltip());
+    _onClick(e) {
+      if (!this._scale) return;
+      const [mx, my] = this._pointer(e);
+      const hit = this._hitMarker(mx, my);
+
+      if (hit >= 0) {
+        const ev = this.state.events[hit];
+        this._selectedEventId = this._markers.ids[hit];
+        this._focusTs = ev.t;
+        if (window.GAS_APP && typeof window.GAS_APP.onEventClicked === "function") {
+          window.GAS_APP.onEventClicked(ev);
+        }
+      } else if (this.state.showMarkers) {
+        this._selectedEventId = null;
+        this._focusTs = null;
+      } else {
+        return;
+      }
+      this._invalidate("overlay");
     }
 
     showTooltip(ev, xPx, yPx) {
@@ -309,6 +559,69 @@
     }
   }
 
+  // Builds the price line/area paths with min/max decimation per pixel column:
+  // each column keeps its first, lowest, highest and last point, so the stroke
+  // looks identical but path size is bounded by chart width, not point count.
+  function buildLinePaths(t, p, s) {
+    const n = t.length;
+    const line = new Path2D();
+    const area = new Path2D();
+    const bottom = PAD.t + s.innerH;
+
+    let col = NaN;
+    let iFirst = 0, iMin = 0, iMax = 0, iLast = 0;
+    let started = false;
+    let prev = -1;
+
+    const emit = (i) => {
+      if (i === prev) return;
+      prev = i;
+      const px = s.x(t[i]);
+      const py = s.y(p[i]);
+      if (!started) {
+        line.moveTo(px, py);
+        area.moveTo(px, py);
+        started = true;
+      } else {
+        line.lineTo(px, py);
+        area.lineTo(px, py);
+      }
+    };
+
+    const flush = () => {
+      emit(iFirst);
+      // Emit the extremes in index order so the path never steps backwards in time
+      if (iMin < iMax) {
+        emit(iMin);
+        emit(iMax);
+      } else {
+        emit(iMax);
+        emit(iMin);
+      }
+      emit(iLast);
+    };
+
+    for (let i = 0; i < n; i++) {
+      const c = Math.floor(s.x(t[i]));
+      if (c !== col) {
+        if (i > 0) flush();
+        col = c;
+        iFirst = iMin = iMax = iLast = i;
+      } else {
+        if (p[i] < p[iMin]) iMin = i;
+        if (p[i] > p[iMax]) iMax = i;
+        iLast = i;
+      }
+    }
+    if (n) flush();
+
+    area.lineTo(s.x(t[n - 1]), bottom);
+    area.lineTo(s.x(t[0]), bottom);
+    area.closePath();
+
+    return { line, area };
+  }
+
   function escapeHtml(s) {
     return String(s).replace(/[&<>"']/g, m => ({
       "&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#039;"